@@ -8,9 +8,10 @@ import logging
 _LOGGER = logging.getLogger(__name__)
 
 from .xl_maxsonar import XLMaxSonar
-from .const import DOMAIN
+from .const import DOMAIN, DISTANCE_SCALE
 import serial_asyncio
 import asyncio
+from functools import partial
 
 PLATFORMS: list[str] = ["sensor"]
 
@@ -20,9 +21,11 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     serial_port="/dev/tty"
     baudrate=9600
     timeout=10
+    conf = config.get(DOMAIN) or {}
+    distance_scale = float(conf.get("distance_scale", DISTANCE_SCALE))
 
     loop = asyncio.get_event_loop()
-    coro = serial_asyncio.create_serial_connection(loop, XLMaxSonar, serial_port, baudrate=baudrate)
+    coro = serial_asyncio.create_serial_connection(loop, partial(XLMaxSonar, baudrate=baudrate, distance_scale=distance_scale), serial_port, baudrate=baudrate)
 
     #run the server
     transport, protocol = await hass.async_add_job(coro)
@@ -30,7 +33,9 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.data[DOMAIN] = protocol
 
     #load sensors
-    hass.helpers.discovery.load_platform("sensor", DOMAIN, {}, config)
+    #optional tank profile, see tank_profile.py
+    discovery_info = {"tank": conf.get("tank")}
+    hass.helpers.discovery.load_platform("sensor", DOMAIN, discovery_info, config)
 
     return True
 
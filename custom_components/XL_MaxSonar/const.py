@@ -5,6 +5,7 @@ LOGGER = logging.getLogger(__package__)
 DOMAIN = "XL_MaxSonar"
 SERIAL_PORT = "/dev/ttyAMA0"
 BAUDRATE = 9600
+DISTANCE_SCALE = 0.01  # raw reading in cm, use 0.001 for the mm (HRXL) models
 NAME = "XL-MaxSonar"
 VERSION = "v0.0beta1"
 ATTRIBUTION = ""
@@ -26,7 +26,9 @@ from homeassistant.const import (
     ELECTRIC_CURRENT_AMPERE,
     TEMP_CELSIUS,
     ELECTRIC_POTENTIAL_VOLT,
-    LENGTH_METERS
+    LENGTH_METERS,
+    SPEED_METERS_PER_SECOND,
+    VOLUME_LITERS,
 )
 
 from homeassistant.components.sensor import SensorEntity
@@ -36,9 +38,11 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 import logging
+import re
 _LOGGER = logging.getLogger(__name__)
 
 from .xl_maxsonar import XLMaxSonar
+from .tank_profile import TankProfile
 from .const import DOMAIN
 
 
@@ -67,6 +71,41 @@ def setup_platform(
 
     new_devices.append(Sensor(device_id, descr, server))
 
+    # smoothed distance change per second, e.g. tank fill or leak rate
+    descr = SensorEntityDescription(
+        key = server.velocity_name,
+        name = server.velocity_name,
+        native_unit_of_measurement = SPEED_METERS_PER_SECOND,
+        state_class = STATE_CLASS_MEASUREMENT,
+    )
+
+    new_devices.append(Sensor(device_id, descr, server))
+
+    tank_conf = discovery_info.get("tank") if discovery_info else None
+    profile = None
+    if tank_conf:
+        try:
+            profile = TankProfile.from_config(tank_conf)
+        except ValueError as err:
+            _LOGGER.error(f"Invalid tank profile, level and volume sensors are not added: {err}")
+
+    if profile:
+        descr = SensorEntityDescription(
+            key = 'level',
+            name = 'level',
+            native_unit_of_measurement = LENGTH_METERS,
+            state_class = STATE_CLASS_MEASUREMENT,
+        )
+        new_devices.append(TankSensor(device_id, descr, server, profile))
+
+        descr = SensorEntityDescription(
+            key = 'volume',
+            name = 'volume',
+            native_unit_of_measurement = VOLUME_LITERS,
+            state_class = STATE_CLASS_MEASUREMENT,
+        )
+        new_devices.append(TankSensor(device_id, descr, server, profile))
+
     #Sensor(device_id, descr, server)
     #for name in server.get_fields():
     #    descr = create_entity_descr(name)
@@ -77,6 +116,9 @@ def setup_platform(
 
 
 def _extract_state_class(name: str):
+    # daily min/max aggregates of SolarmanServer, e.g. AC_Power_daily_max_W
+    if re.search(r"_daily_m(in|ax)(_[^_]*)?$", name):
+        return STATE_CLASS_MEASUREMENT
     if "total" in name.lower() or "daily" in name.lower():
         return STATE_CLASS_TOTAL_INCREASING
     return STATE_CLASS_MEASUREMENT
@@ -175,3 +217,22 @@ class Sensor(SensorEntity):
     async def async_will_remove_from_hass(self):
         """Entity being removed from hass."""
         self._server.remove_callback(self.async_write_ha_state)
+
+
+class TankSensor(Sensor):
+    """Level or volume derived from the distance using a tank profile."""
+
+    def __init__(
+        self, device_id, descr: SensorEntityDescription, server: XLMaxSonar, profile: TankProfile
+    ):
+        """Initialize the sensor."""
+        super().__init__(device_id, descr, server)
+        self._profile = profile
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        distance = self._server.get_value('distance')
+        if self._name == 'level':
+            return self._profile.level(distance)
+        return self._profile.volume(distance)
@@ -6,6 +6,8 @@ from datetime import datetime
 from io import BytesIO
 from functools import reduce
 from struct import unpack_from, pack
+import json
+import os
 import time
 from typing import Callable
 
@@ -22,26 +24,38 @@ from dataclasses import dataclass, field
 class SolarmanServer:
     """Basic implementation of TCP server for processing of Solis data logger"""
 
-    def __init__( self, serial_port="/dev/ttyAMA0", baudrate=9600, timeout=10):
+    def __init__( self, serial_port="/dev/ttyAMA0", baudrate=9600, timeout=10,
+                  storage_path=None, max_gap=600, save_interval=300):
         self._callbacks = set()
         self._raw_callbacks = set()
         self.serial_port = serial_port
         self.baudrate = baudrate
         self.timeout = timeout  # seconds
         self._raw_data = None
-        
+        self.storage_path = storage_path  # json file to persist the aggregates, e.g. under hass.config.path()
+        self.max_gap = max_gap  # seconds, power is not integrated over longer gaps
+        self.save_interval = save_interval  # seconds between writes of the aggregates
+        self.aggregates = self._load_aggregates()
+        self._saved_day = self.aggregates["day"]
+        self._last_save = time.time()
 
     @property
     def client_connected(self):
         return False
 
     def get_fields(self):
-        """Return valid sensor fields"""
-        return [
+        """Return valid sensor fields, including the derived aggregates"""
+        fields = [
             name
             for name in self.inverter_fields.keys()
             if len(self.inverter_fields[name]) == 3
         ]
+        derived = [
+            name
+            for field in fields if self.inverter_fields[field][0] != "string"
+            for name in self._aggregate_names(field).values()
+        ]
+        return fields + derived
 
     @property
     def data(self):
@@ -80,6 +94,8 @@ class SolarmanServer:
             if self.new_message:
                 return self.parsed_data.items()
             raise err
+        finally:
+            self.save_aggregates()
 
     async def handle_client(self, reader, writer):
         """TCP client connection handler"""
@@ -102,6 +118,8 @@ class SolarmanServer:
                 raw_data = msghdr + payload_plus_footer
 
                 self.parsed_data = self.parse_inverter_message(raw_data)
+                self.parsed_data.update(self.update_aggregates(self.parsed_data))
+                await self.async_save_aggregates()
                 logger.debug("Parsed message: %s" % self.parsed_data)
 
                 self.new_message = True
@@ -178,6 +196,135 @@ class SolarmanServer:
 
         return out_dict
 
+    def _aggregate_names(self, name):
+        """Names of the derived fields, the unit suffix is kept as last part of the name"""
+        base, _, unit = name.rpartition("_")
+        if not base:
+            base, unit = name, ""
+        suffix = "_" + unit if unit else ""
+        names = {}
+        if not self._is_counter(name):
+            names["daily_min"] = base + "_daily_min" + suffix
+            names["daily_max"] = base + "_daily_max" + suffix
+        if unit == "W":
+            names["total_energy"] = base + "_total_kWh"
+            names["daily_energy"] = base + "_daily_kWh"
+        return names
+
+    def _is_counter(self, name):
+        """Check if a field is already an energy counter rather than a measurement"""
+        return name.endswith("_kWh") or "total" in name.lower() or "daily" in name.lower()
+
+    def update_aggregates(self, values, timestamp=None):
+        """Integrate power fields into energy and update the daily min/max values
+
+        Power (*_W) is integrated with the trapezoidal rule between successive
+        datagrams, gaps longer than max_gap are skipped. Returns the derived fields.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        agg = self.aggregates
+        day = datetime.fromtimestamp(timestamp).date().isoformat()
+
+        if agg.get("day") != day:
+            agg["day"] = day
+            agg["daily"] = {}
+
+        last_timestamp = agg.get("timestamp")
+        dt = timestamp - last_timestamp if last_timestamp is not None else None
+        integrate = dt is not None and 0 < dt <= self.max_gap
+
+        out_dict = {}
+        for name, value in values.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            names = self._aggregate_names(name)
+
+            daily = agg["daily"]
+            if "daily_min" in names:
+                daily[names["daily_min"]] = min(daily.get(names["daily_min"], value), value)
+                daily[names["daily_max"]] = max(daily.get(names["daily_max"], value), value)
+
+            if "total_energy" in names:
+                last_power = agg["power"].get(name)
+                energy = 0
+                if integrate and last_power is not None:
+                    # W * s -> kWh, negative power is not counted as energy
+                    energy = max(last_power + value, 0) / 2 * dt / 3600000
+                agg["power"][name] = value
+                agg["total"][names["total_energy"]] = agg["total"].get(names["total_energy"], 0) + energy
+                daily[names["daily_energy"]] = daily.get(names["daily_energy"], 0) + energy
+                out_dict[names["total_energy"]] = agg["total"][names["total_energy"]]
+
+            for key in ("daily_min", "daily_max", "daily_energy"):
+                if key in names:
+                    out_dict[names[key]] = daily[names[key]]
+
+        agg["timestamp"] = timestamp
+        return out_dict
+
+    def _load_aggregates(self):
+        """Load the persisted aggregates, start from scratch if not available"""
+        agg = {"day": None, "timestamp": None, "power": {}, "total": {}, "daily": {}}
+        if self.storage_path and os.path.exists(self.storage_path):
+            try:
+                with open(self.storage_path) as fp:
+                    loaded = json.load(fp)
+            except (OSError, ValueError) as err:
+                logger.warning("Unable to load aggregates from %s: %s" % (self.storage_path, err))
+                return agg
+
+            if self._valid_aggregates(loaded):
+                agg.update(loaded)
+            else:
+                logger.warning("Invalid aggregates in %s, starting from scratch" % self.storage_path)
+        return agg
+
+    def _valid_aggregates(self, loaded):
+        """Check the structure of persisted aggregates before using them"""
+        if not isinstance(loaded, dict):
+            return False
+        if not all(isinstance(loaded.get(key, {}), dict) for key in ("power", "total", "daily")):
+            return False
+        if not isinstance(loaded.get("day"), (str, type(None))):
+            return False
+        timestamp = loaded.get("timestamp")
+        return timestamp is None or (isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool))
+
+    def _save_due(self):
+        """Save at a day change and otherwise at most every save_interval seconds"""
+        return (
+            self.aggregates["day"] != self._saved_day
+            or time.time() - self._last_save >= self.save_interval
+        )
+
+    async def async_save_aggregates(self):
+        """Persist the aggregates when due, the file is written in an executor"""
+        if not self.storage_path or not self._save_due():
+            return
+        content = self._mark_saved()
+        await asyncio.get_running_loop().run_in_executor(None, self._write_aggregates, content)
+
+    def save_aggregates(self):
+        """Persist the aggregates now, e.g. at shutdown"""
+        if self.storage_path:
+            self._write_aggregates(self._mark_saved())
+
+    def _mark_saved(self):
+        """Serialize the aggregates and reset the save timer"""
+        self._saved_day = self.aggregates["day"]
+        self._last_save = time.time()
+        return json.dumps(self.aggregates)
+
+    def _write_aggregates(self, content):
+        """Write the serialized aggregates, replacing the file atomically"""
+        tmp_path = self.storage_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as fp:
+                fp.write(content)
+            os.replace(tmp_path, self.storage_path)
+        except OSError as err:
+            logger.warning("Unable to save aggregates to %s: %s" % (self.storage_path, err))
+
     def register_callback(self, callback: Callable[[], None]) -> None:
         """Register callback, called when a new message was received."""
         self._callbacks.add(callback)
@@ -202,7 +349,7 @@ class SolarmanServer:
 
 
 def main():
-    ser = SolarmanServer(solis_inverter_fields)
+    ser = SolarmanServer(solis_inverter_fields, storage_path="solarman_aggregates.json")
 
     def callback_example():
         print(ser.data)
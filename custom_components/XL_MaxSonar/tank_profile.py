@@ -0,0 +1,125 @@
+"""
+Tank profiles to convert a measured distance into liquid level and volume.
+
+Each profile is compiled once into a lookup table of (level, volume) points,
+converting a distance is a table lookup with linear interpolation.
+"""
+from bisect import bisect_right
+import math
+
+import logging
+
+# create logger
+logger = logging.getLogger("logger")
+
+CYLINDER = "cylinder"
+HORIZONTAL_CYLINDER = "horizontal_cylinder"
+RECTANGULAR = "rectangular"
+TABLE = "table"
+
+# number of points sampled for the geometric profiles
+TABLE_SIZE = 256
+
+
+def _cylinder(diameter, height):
+    """Vertical cylinder, volume in liters at level h (m)"""
+    area = math.pi * (diameter / 2) ** 2
+    return height, lambda h: area * h * 1000
+
+
+def _horizontal_cylinder(diameter, length):
+    """Horizontal cylinder, volume in liters at level h (m)"""
+    r = diameter / 2
+
+    def volume(h):
+        # sampled levels can exceed the diameter by a rounding error
+        h = min(max(h, 0), diameter)
+        segment = r ** 2 * math.acos((r - h) / r) - (r - h) * math.sqrt(max(2 * r * h - h ** 2, 0))
+        return segment * length * 1000
+
+    return diameter, volume
+
+
+def _rectangular(width, length, height):
+    """Rectangular tank, volume in liters at level h (m)"""
+    return height, lambda h: width * length * h * 1000
+
+
+class TankProfile:
+    """Lookup table for the level and volume of a tank
+
+    sensor_height is the distance (m) between the sensor and the bottom of the tank.
+    """
+
+    def __init__(self, sensor_height, points):
+        try:
+            points = sorted((float(level), float(volume)) for level, volume in points)
+        except (TypeError, ValueError):
+            raise ValueError("Tank profile points must be [level, volume] pairs")
+        if len(points) < 2:
+            raise ValueError("Tank profile requires at least 2 calibration points")
+
+        self.sensor_height = float(sensor_height)
+        self.levels = [level for level, _ in points]
+        self.volumes = [volume for _, volume in points]
+
+    @classmethod
+    def from_config(cls, conf):
+        """Compile a profile from the `tank` configuration dictionary"""
+        shape = conf.get("shape", CYLINDER)
+
+        def value(key, default=None):
+            if key not in conf and default is None:
+                raise ValueError("Missing '%s' for %s tank profile" % (key, shape))
+            try:
+                result = float(conf.get(key, default))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid '%s' for tank profile: %r" % (key, conf.get(key)))
+            if not result > 0:
+                raise ValueError("'%s' for tank profile must be positive: %r" % (key, conf.get(key, default)))
+            return result
+
+        sensor_height = value("sensor_height")
+
+        if shape == TABLE:
+            try:
+                return cls(sensor_height, conf["table"])
+            except (KeyError, TypeError) as err:
+                raise ValueError("Invalid calibration table for tank profile: %s" % err)
+
+        if shape == CYLINDER:
+            height, volume = _cylinder(value("diameter"), value("height", sensor_height))
+        elif shape == HORIZONTAL_CYLINDER:
+            height, volume = _horizontal_cylinder(value("diameter"), value("length"))
+        elif shape == RECTANGULAR:
+            height, volume = _rectangular(value("width"), value("length"), value("height", sensor_height))
+        else:
+            raise ValueError("Unknown tank shape: " + str(shape))
+
+        step = height / (TABLE_SIZE - 1)
+        points = [(i * step, volume(i * step)) for i in range(TABLE_SIZE)]
+        logger.debug("Compiled %s tank profile with %d points" % (shape, len(points)))
+        return cls(sensor_height, points)
+
+    def level(self, distance):
+        """Return the liquid level (m) for a measured distance (m)"""
+        if distance is None:
+            return None
+        return self.sensor_height - float(distance)
+
+    def volume(self, distance):
+        """Return the interpolated volume for a measured distance (m)
+
+        Levels outside the table return the volume at the table limits.
+        """
+        level = self.level(distance)
+        if level is None:
+            return None
+        level = min(max(level, self.levels[0]), self.levels[-1])
+
+        idx = min(bisect_right(self.levels, level), len(self.levels) - 1)
+        l0, l1 = self.levels[idx - 1], self.levels[idx]
+        v0, v1 = self.volumes[idx - 1], self.volumes[idx]
+        if l1 == l0:
+            return v1
+        return v0 + (v1 - v0) * (level - l0) / (l1 - l0)
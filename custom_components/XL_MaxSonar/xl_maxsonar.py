@@ -8,6 +8,7 @@ from functools import reduce
 from struct import unpack_from, pack
 import time
 from typing import Callable
+import math
 import re
 
 import logging
@@ -19,13 +20,17 @@ logger.setLevel(logging.DEBUG)
 from dataclasses import dataclass, field
 
 import asyncio
-import serial_asyncio
+
+# 8N1 framing: start bit + 8 data bits + stop bit per transmitted byte
+BITS_PER_BYTE = 10
 
 
 class XLMaxSonar(asyncio.Protocol):
     """Basic implementation for XLMaxSonar"""
 
-    def __init__( self , regex = r"R(\d+)\s", val_names=["distance"], extra_arg=None):
+    def __init__( self , regex = r"R(\d+)\s", val_names=["distance"], extra_arg=None,
+                  baudrate=9600, velocity_name="velocity", velocity_tau=5.0, frame_period=0.1,
+                  distance_scale=0.01):
         super().__init__()
         self._callbacks = set()
         self._raw_callbacks = set()
@@ -36,15 +41,26 @@ class XLMaxSonar(asyncio.Protocol):
         self.debug = None
         self.parsed_data = dict(zip(val_names, [None]*len(val_names)))
         self.val_names = val_names
+        self.byte_time = BITS_PER_BYTE / baudrate  # seconds on the wire per byte
+        self.distance_scale = distance_scale  # raw reading to meters, 0.01 for cm
+        self.frame_period = frame_period  # minimal time between two frames of the sensor
+        self.timestamp = None  # monotonic time of the last decoded frame
+        self.velocity_name = velocity_name
+        self.velocity_tau = velocity_tau  # smoothing time constant in seconds
+        self._last_distance = None
+        self.parsed_data[velocity_name] = None
         print(extra_arg)
 
     def get_fields(self):
-        return self.val_names
+        return self.val_names + [self.velocity_name]
 
     def connection_made(self, transport):
         self.transport = transport
 
     def data_received(self, data):
+        # the last byte of the chunk has just arrived, earlier bytes were
+        # received byte_time seconds apart from each other
+        received_at = time.monotonic()
         self.buffer += data
 
         #self.pause_reading() # required?
@@ -52,18 +68,38 @@ class XLMaxSonar(asyncio.Protocol):
         if self.debug:
             print('data buffer', repr(self.buffer))
 
-        matches = re.finditer(self.regex, self.buffer.decode('utf-8'))
-        match_cnt = 0
-
-        for matchNum, match in enumerate(matches, start=1):
+        matches = list(re.finditer(self.regex, self.buffer.decode('utf-8')))
+        match_cnt = len(matches)
+
+        # interpolate the frame times backwards from the end of the buffer, using
+        # the bytes that followed each frame. Frames buffered by the OS arrive in
+        # one burst, so they are spaced at least one frame period apart.
+        timestamps = []
+        timestamp = received_at
+        for match in reversed(matches):
+            timestamp = min(
+                received_at - (len(self.buffer) - match.end()) * self.byte_time,
+                timestamp - self.frame_period if timestamps else timestamp,
+            )
+            timestamps.insert(0, timestamp)
+
+        # keep the timestamps monotonic: spread a burst that would start before
+        # the previous frame evenly between that frame and the last one
+        if timestamps and self.timestamp is not None and timestamps[0] <= self.timestamp:
+            spacing = max(timestamps[-1] - self.timestamp, 0) / len(timestamps)
+            timestamps = [self.timestamp + (i + 1) * spacing for i in range(len(timestamps))]
+
+        for matchNum, (match, timestamp) in enumerate(zip(matches, timestamps), start=1):
             if self.debug:
                 print ("Match {matchNum} was found at {start}-{end}: {match}".format(matchNum = matchNum, start = match.start(), end = match.end(), match = match.group()))
 
-            match_cnt = matchNum
             self.match = match
+            self._update_velocity(self._to_meters(match.group(1)), timestamp)
+            self.timestamp = timestamp
 
         if match_cnt:
-            self.buffer = b''
+            # keep a partial trailing frame for the next chunk
+            self.buffer = self.buffer[self.match.end():]
 
             match_dict = {}
             for groupNum in range(0, len(self.match.groups())):
@@ -72,8 +108,9 @@ class XLMaxSonar(asyncio.Protocol):
                     raise Exception("To many matched values!")
 
                 name = self.val_names[groupNum]
-                match_dict[name] = self.match.group(groupNum + 1)
+                match_dict[name] = self._to_meters(self.match.group(groupNum + 1))
 
+            match_dict[self.velocity_name] = self.parsed_data.get(self.velocity_name)
             self.parsed_data = match_dict
             print(match_dict)
 
@@ -83,7 +120,34 @@ class XLMaxSonar(asyncio.Protocol):
 
         #self.resume_reading()
 
-
+    def _to_meters(self, value):
+        """Convert a raw reading (cm or mm, see distance_scale) to meters"""
+        return int(value) * self.distance_scale
+
+    def _update_velocity(self, value, timestamp):
+        """Update the smoothed rate of change of the first value (m/s)
+
+        An exponential moving average weighted by the time between frames is
+        used, so irregular frame intervals are handled correctly.
+        """
+        try:
+            distance = float(value)
+        except (TypeError, ValueError):
+            return
+
+        if self._last_distance is not None:
+            last_distance, last_timestamp = self._last_distance
+            dt = timestamp - last_timestamp
+            if dt <= 0:
+                return
+            rate = (distance - last_distance) / dt
+            # start from rest so a single noisy first rate is damped as well
+            velocity = self.parsed_data.get(self.velocity_name) or 0.0
+            alpha = 1 - math.exp(-dt / self.velocity_tau)
+            velocity += alpha * (rate - velocity)
+            self.parsed_data[self.velocity_name] = velocity
+
+        self._last_distance = (distance, timestamp)
 
     def pause_reading(self):
         # This will stop the callbacks to data_received
@@ -130,6 +194,8 @@ class XLMaxSonar(asyncio.Protocol):
 
 
 if __name__ == "__main__":
+    import serial_asyncio
+
     serial_port="/dev/tty"
     baudrate=9600
     timeout=10
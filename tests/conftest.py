@@ -0,0 +1,7 @@
+"""Make the component modules importable without Home Assistant."""
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "XL_MaxSonar")
+)
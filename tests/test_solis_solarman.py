@@ -0,0 +1,114 @@
+"""Tests for the incremental aggregates of the Solarman server."""
+import asyncio
+from datetime import datetime
+import json
+
+import pytest
+
+from solis_solarman import SolarmanServer
+
+
+@pytest.fixture
+def server():
+    return SolarmanServer(storage_path=None)
+
+
+def test_power_is_integrated_with_trapezoidal_rule(server):
+    t0 = datetime(2026, 6, 1, 12, 0).timestamp()
+    out = server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0)
+    assert out["AC_Power_total_kWh"] == 0
+
+    # 6 minutes at an average of 2 kW
+    out = server.update_aggregates({"AC_Power_W": 3000}, timestamp=t0 + 360)
+    assert out["AC_Power_total_kWh"] == pytest.approx(0.2)
+    assert out["AC_Power_daily_kWh"] == pytest.approx(0.2)
+    assert out["AC_Power_daily_min_W"] == 1000
+    assert out["AC_Power_daily_max_W"] == 3000
+
+
+def test_long_gaps_and_negative_power_are_not_integrated(server):
+    t0 = datetime(2026, 6, 1, 12, 0).timestamp()
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0)
+    out = server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0 + server.max_gap + 1)
+    assert out["AC_Power_total_kWh"] == 0
+
+    server.update_aggregates({"AC_Power_W": -500}, timestamp=t0 + 2 * server.max_gap + 10)
+    out = server.update_aggregates({"AC_Power_W": -500}, timestamp=t0 + 2 * server.max_gap + 70)
+    assert out["AC_Power_total_kWh"] == 0
+
+
+def test_daily_values_reset_at_day_change(server):
+    t0 = datetime(2026, 6, 1, 23, 54).timestamp()
+    server.update_aggregates({"AC_Power_W": 2000, "Temp_C": 30.0}, timestamp=t0)
+    server.update_aggregates({"AC_Power_W": 2000, "Temp_C": 35.0}, timestamp=t0 + 180)
+
+    out = server.update_aggregates({"AC_Power_W": 2000, "Temp_C": 20.0}, timestamp=t0 + 540)
+    assert out["AC_Power_total_kWh"] == pytest.approx(0.3)
+    assert out["AC_Power_daily_kWh"] == pytest.approx(0.2)
+    assert out["Temp_daily_min_C"] == 20.0
+    assert out["Temp_daily_max_C"] == 20.0
+
+
+def test_counters_and_strings_get_no_min_max(server):
+    out = server.update_aggregates(
+        {"Total_Energy_kWh": 1234.5, "Energy_Today_kWh": 3.2, "Daily_Yield": 3, "Serial": "ABC"},
+        timestamp=datetime(2026, 6, 1, 12, 0).timestamp(),
+    )
+    assert out == {}
+
+
+def test_aggregates_survive_restart(tmp_path):
+    path = str(tmp_path / "aggregates.json")
+    t0 = datetime(2026, 6, 1, 12, 0).timestamp()
+
+    server = SolarmanServer(storage_path=path)
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0)
+    server.update_aggregates({"AC_Power_W": 3000}, timestamp=t0 + 360)
+    server.save_aggregates()
+
+    server = SolarmanServer(storage_path=path)
+    out = server.update_aggregates({"AC_Power_W": 3000}, timestamp=t0 + 720)
+    assert out["AC_Power_total_kWh"] == pytest.approx(0.5)
+    assert out["AC_Power_daily_min_W"] == 1000
+
+
+def test_saving_is_throttled_until_day_change(tmp_path):
+    path = tmp_path / "aggregates.json"
+    t0 = datetime(2026, 6, 1, 23, 58).timestamp()
+    server = SolarmanServer(storage_path=str(path), save_interval=3600)
+
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0)
+    asyncio.run(server.async_save_aggregates())
+    assert json.loads(path.read_text())["day"] == "2026-06-01"
+
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0 + 60)
+    path.unlink()
+    asyncio.run(server.async_save_aggregates())
+    assert not path.exists()
+
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=t0 + 180)
+    asyncio.run(server.async_save_aggregates())
+    assert json.loads(path.read_text())["day"] == "2026-06-02"
+
+
+def test_no_persistence_without_storage_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = SolarmanServer()
+    server.update_aggregates({"AC_Power_W": 1000}, timestamp=datetime(2026, 6, 1, 12, 0).timestamp())
+    server.save_aggregates()
+    asyncio.run(server.async_save_aggregates())
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["[1, 2]", "null", '"text"', '{"power": null}', '{"daily": []}', '{"timestamp": "now"}', "{broken"],
+)
+def test_invalid_storage_starts_fresh(tmp_path, content):
+    path = tmp_path / "aggregates.json"
+    path.write_text(content)
+
+    server = SolarmanServer(storage_path=str(path))
+    out = server.update_aggregates({"AC_Power_W": 1000}, timestamp=datetime(2026, 6, 1, 12, 0).timestamp())
+    assert out["AC_Power_total_kWh"] == 0
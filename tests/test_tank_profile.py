@@ -0,0 +1,86 @@
+"""Tests for the tank profile lookup tables."""
+import math
+
+import pytest
+
+from tank_profile import TankProfile
+
+
+def test_cylinder_volume_is_linear_in_level():
+    profile = TankProfile.from_config({"shape": "cylinder", "sensor_height": "1.2", "diameter": 1.0})
+
+    area = math.pi * 0.5 ** 2
+    assert profile.level(0.7) == pytest.approx(0.5)
+    assert profile.volume(0.7) == pytest.approx(area * 0.5 * 1000)
+
+
+def test_horizontal_cylinder_half_full():
+    profile = TankProfile.from_config(
+        {"shape": "horizontal_cylinder", "sensor_height": 1.1, "diameter": 1.0, "length": 2.0}
+    )
+
+    assert profile.volume(0.6) == pytest.approx(math.pi * 0.25 * 2.0 * 1000 / 2, rel=1e-4)
+    assert profile.volume(0.1) == pytest.approx(math.pi * 0.25 * 2.0 * 1000, rel=1e-4)
+
+
+@pytest.mark.parametrize("diameter", [0.997, 1.994, 1.997])
+def test_horizontal_cylinder_table_ends_at_full_volume(diameter):
+    profile = TankProfile.from_config(
+        {"shape": "horizontal_cylinder", "sensor_height": diameter, "diameter": diameter, "length": 1.0}
+    )
+
+    assert profile.volume(0) == pytest.approx(math.pi * (diameter / 2) ** 2 * 1000)
+
+
+def test_rectangular_volume():
+    profile = TankProfile.from_config(
+        {"shape": "rectangular", "sensor_height": 2.0, "width": 1.0, "length": 2.0, "height": 1.5}
+    )
+
+    assert profile.volume(1.5) == pytest.approx(1000)
+
+
+def test_calibration_table_interpolation():
+    profile = TankProfile.from_config(
+        {"shape": "table", "sensor_height": 1.0, "table": [[0.5, 100], [0.1, 0], [0.9, 300]]}
+    )
+
+    assert profile.volume(0.7) == pytest.approx(50)
+    assert profile.volume(0.3) == pytest.approx(200)
+
+
+def test_level_is_not_clipped_but_volume_is():
+    profile = TankProfile.from_config(
+        {"shape": "table", "sensor_height": 1.0, "table": [[0.1, 0], [0.9, 300]]}
+    )
+
+    assert profile.level(0.95) == pytest.approx(0.05)
+    assert profile.volume(0.95) == 0
+    assert profile.level(-0.2) == pytest.approx(1.2)
+    assert profile.volume(-0.2) == 300
+    assert profile.volume(None) is None
+
+
+@pytest.mark.parametrize(
+    "conf",
+    [
+        {"shape": "sphere", "sensor_height": 1.0},
+        {"shape": "cylinder", "diameter": 1.0},
+        {"shape": "cylinder", "sensor_height": "high", "diameter": 1.0},
+        {"shape": "horizontal_cylinder", "sensor_height": 1.0, "diameter": 1.0},
+        {"shape": "table", "sensor_height": 1.0, "table": [[0, 0]]},
+        {"shape": "table", "sensor_height": 1.0, "table": [1, 2]},
+        {"shape": "table", "sensor_height": 1.0},
+        {"shape": "table", "sensor_height": 0, "table": [[0, 0], [1, 100]]},
+        {"shape": "cylinder", "sensor_height": 0, "diameter": 1.0},
+        {"shape": "cylinder", "sensor_height": 1.0, "diameter": -1.0},
+        {"shape": "cylinder", "sensor_height": 1.0, "diameter": 1.0, "height": -1.0},
+        {"shape": "horizontal_cylinder", "sensor_height": 1.0, "diameter": 1.0, "length": 0},
+        {"shape": "rectangular", "sensor_height": 1.0, "width": -1.0, "length": 1.0},
+        {"shape": "rectangular", "sensor_height": 1.0, "width": 1.0, "length": -1.0},
+        {"shape": "rectangular", "sensor_height": 1.0, "width": 1.0, "length": 1.0, "height": "nan"},
+    ],
+)
+def test_invalid_config_raises_value_error(conf):
+    with pytest.raises(ValueError):
+        TankProfile.from_config(conf)
@@ -0,0 +1,85 @@
+"""Tests for the XL-MaxSonar serial protocol."""
+import math
+
+import pytest
+
+import xl_maxsonar
+from xl_maxsonar import XLMaxSonar
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(xl_maxsonar.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_frames_are_spaced_by_frame_period(clock):
+    sonar = XLMaxSonar()
+    sonar.data_received(b"R123\rR124\rR1")
+
+    # the second frame is followed by 2 bytes, the first one a frame period earlier
+    assert sonar.timestamp == pytest.approx(100.0 - 2 * sonar.byte_time)
+    assert sonar.get_value("distance") == pytest.approx(1.24)
+    assert sonar.buffer == b"R1"
+
+    # 1 cm over one frame period, damped by the moving average started at 0
+    rate = 0.01 / sonar.frame_period
+    alpha = 1 - math.exp(-sonar.frame_period / sonar.velocity_tau)
+    assert sonar.get_value("velocity") == pytest.approx(alpha * rate)
+
+
+def test_burst_after_previous_chunk_stays_monotonic(clock):
+    sonar = XLMaxSonar()
+    timestamps = []
+    update_velocity = sonar._update_velocity
+
+    def spy(value, timestamp):
+        timestamps.append(timestamp)
+        update_velocity(value, timestamp)
+
+    sonar._update_velocity = spy
+
+    sonar.data_received(b"R100\r")
+    clock[0] = 100.05
+    sonar.data_received(b"R101\rR102\rR103\r")
+
+    assert timestamps == pytest.approx([100.0, 100.0 + 0.05 / 3, 100.0 + 0.1 / 3, 100.05])
+    assert all(t1 > t0 for t0, t1 in zip(timestamps, timestamps[1:]))
+    assert sonar.timestamp == pytest.approx(100.05)
+    assert sonar._last_distance == (pytest.approx(1.03), pytest.approx(100.05))
+
+    # every frame contributed to the average
+    velocity = 0.0
+    for dt in (0.05 / 3,) * 3:
+        alpha = 1 - math.exp(-dt / sonar.velocity_tau)
+        velocity += alpha * (0.01 / dt - velocity)
+    assert sonar.get_value("velocity") == pytest.approx(velocity)
+
+
+def test_split_frame_is_completed_by_next_chunk(clock):
+    sonar = XLMaxSonar()
+    sonar.data_received(b"R123\rR1")
+    assert sonar.get_value("distance") == pytest.approx(1.23)
+
+    clock[0] += 0.1
+    sonar.data_received(b"24\r")
+    assert sonar.get_value("distance") == pytest.approx(1.24)
+    assert sonar.buffer == b""
+    assert sonar.timestamp == pytest.approx(100.1)
+
+
+def test_velocity_converges_to_constant_rate(clock):
+    sonar = XLMaxSonar(velocity_tau=1.0)
+    for i in range(200):
+        sonar.data_received(b"R%d\r" % (1000 + i))
+        clock[0] += 0.1
+
+    # 1 cm per 100 ms
+    assert sonar.get_value("velocity") == pytest.approx(0.1, rel=1e-3)
+
+
+def test_distance_scale_for_mm_models(clock):
+    sonar = XLMaxSonar(distance_scale=0.001)
+    sonar.data_received(b"R1234\r")
+    assert sonar.get_value("distance") == pytest.approx(1.234)